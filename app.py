@@ -65,7 +65,7 @@ if SRC_DIR not in sys.path:
 # --- Importy logiki backendu ---
 try:
     from config import Config
-    from graph import build_workflow
+    from graph import build_workflow, build_refresh_workflow
 except Exception as e:
     st.error(f"Błąd krytyczny importu modułów z katalogu src. Szczegóły: {e}")
     st.stop()
@@ -112,9 +112,23 @@ except Exception as e:
 # --- UI: parametry wejściowe ---
 st.header("1. Parametry artykułu")
 
+mode = st.radio("Tryb", options=["Nowy artykuł", "Odświeżenie"], horizontal=True)
+previous_run = None
+if mode == "Odświeżenie":
+    uploaded_run = st.file_uploader("Artefakty poprzedniego runu (run.json)", type=["json"])
+    if uploaded_run is not None:
+        try:
+            previous_run = json.load(uploaded_run)
+        except Exception as e:
+            st.error(f"Nie udało się wczytać run.json. Szczegóły: {e}")
+
 col1, col2 = st.columns(2)
 with col1:
-    keyword = st.text_input("Słowo kluczowe", placeholder="np. najlepsza karma dla kota")
+    keyword = st.text_input(
+        "Słowo kluczowe",
+        value=(previous_run or {}).get("keyword", ""),
+        placeholder="np. najlepsza karma dla kota"
+    )
 with col2:
     selected_persona_name = st.selectbox("Wybierz personę", options=persona_names, index=0 if persona_names else None)
 
@@ -134,7 +148,7 @@ if "last_run" not in st.session_state:
 start_button = st.button(
     "🚀 Generuj artykuł",
     type="primary",
-    disabled=not all([keyword, selected_persona_name])
+    disabled=not all([keyword, selected_persona_name]) or (mode == "Odświeżenie" and not previous_run)
 )
 
 if start_button:
@@ -147,7 +161,7 @@ if start_button:
             print_capture.set_placeholder(live_log_container)
 
             # Budowa workflow
-            workflow_app = build_workflow()
+            workflow_app = build_refresh_workflow() if previous_run else build_workflow()
             print("✅ Workflow skompilowany")
 
             # Wybór modelu
@@ -159,6 +173,8 @@ if start_button:
                 "keyword": keyword,
                 "persona": personas[selected_persona_name]
             }
+            if previous_run:
+                initial_state["previous_run"] = previous_run
 
             print(f"🧠 Model: {available_models[model_key]['name']}")
             print(f"📝 Keyword: {keyword}")
@@ -196,7 +212,13 @@ if start_button:
                 step_counter += 1
                 print(f"🔄 Krok #{step_counter}: {step_name}")
 
-                # 4) RESEARCH
+                # 4) REFRESH DIFF
+                if "refresh_diff" in payload:
+                    with ui["research"]:
+                        st.markdown("**Zmiany w SERP / źródłach:**")
+                        st.json(final_state["refresh_diff"])
+
+                # 5) RESEARCH
                 if any(k in payload for k in ("research_corpus", "research_summary", "raw_research_data")):
                     with ui["research"]:
                         st.markdown("**Podsumowanie:**")
@@ -218,7 +240,7 @@ if start_button:
                             key=f"dl_research_{uuid.uuid4()}"
                         )
 
-                # 5) OUTLINE
+                # 6) OUTLINE
                 if "outline" in payload:
                     with ui["outline"]:
                         st.json(final_state["outline"])
@@ -230,7 +252,7 @@ if start_button:
                             key=f"dl_outline_{uuid.uuid4()}"
                         )
 
-                # 6) DRAFT
+                # 7) DRAFT
                 if "raw_article" in payload:
                     with ui["draft"]:
                         st.markdown(final_state["raw_article"][:30000])
@@ -242,7 +264,7 @@ if start_button:
                             key=f"dl_draft_{uuid.uuid4()}"
                         )
 
-                # 7) POLISH
+                # 8) POLISH
                 if "final_article" in payload:
                     with ui["polish"]:
                         fa = (final_state.get("final_article") or "").strip()
@@ -258,7 +280,7 @@ if start_button:
                             key=f"dl_final_{uuid.uuid4()}"
                         )
 
-                # 8) SEO
+                # 9) SEO
                 if any(k in payload for k in ("meta_title", "meta_description")):
                     with ui["seo"]:
                         # fallback: wspiera zarówno spłaszczone jak i zagnieżdżone
@@ -266,6 +288,17 @@ if start_button:
                         meta_desc = final_state.get("meta_description") or final_state.get("seo_generator", {}).get("meta_description") or ""
                         st.text_input("Meta Title", value=meta_title, key=f"meta_title_{uuid.uuid4()}")
                         st.text_area("Meta Description", value=meta_desc, height=80, key=f"meta_desc_{uuid.uuid4()}")
+                        seo_report = final_state.get("seo_report")
+                        if seo_report:
+                            st.caption(f"Meta Title: {len(meta_title)} znaków • Meta Description: {len(meta_desc)} znaków")
+                            if seo_report.get("passed"):
+                                st.success(f"✅ Walidacja SEO OK (poprawki LLM: {seo_report.get('llm_fixes', 0)})")
+                            else:
+                                st.warning("⚠️ Walidacja SEO zgłasza problemy:")
+                            for issue in seo_report.get("issues", []):
+                                st.markdown(f"- {'❌' if issue['severity'] == 'error' else '⚠️'} {issue['message']}")
+                            if seo_report.get("missing_phrases"):
+                                st.markdown("**Brakujące frazy must-have:** " + ", ".join(seo_report["missing_phrases"]))
                         meta_json = json.dumps({
                             "title": meta_title,
                             "description": meta_desc
@@ -309,6 +342,22 @@ if start_button:
             else:
                 st.error("Nie powstał finalny artykuł ani draft. Sprawdź zakładkę Debug.")
 
+            # artefakty do przyszłego odświeżenia (tryb "Odświeżenie")
+            run_kw = re.sub(r"\W+", "_", keyword.lower()).strip("_") or "artykul"
+            run_artifacts = {"keyword": keyword}
+            for k in ("research_corpus", "research_summary", "raw_research_data", "outline",
+                      "raw_article", "h1_title", "final_article", "meta_title", "meta_description",
+                      "seo_report"):
+                if k in final_state:
+                    run_artifacts[k] = final_state[k]
+            st.download_button(
+                "📥 Pobierz run.json (do odświeżenia)",
+                data=json.dumps(run_artifacts, ensure_ascii=False, indent=2),
+                file_name=f"run_{run_kw}.json",
+                mime="application/json",
+                key=f"dl_run_{uuid.uuid4()}"
+            )
+
             # Debug - snapshot stanu
             with ui["debug"]:
                 st.markdown("**Klucze final_state:**")
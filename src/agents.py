@@ -4,13 +4,30 @@ import json
 import time
 import html
 import random
+import asyncio
+import httpx
 import requests
-from typing import List, Dict, Any
+from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError as FuturesTimeout
+from typing import List, Dict, Any, Tuple, Optional
 from bs4 import BeautifulSoup
 from googleapiclient.discovery import build
 from langchain_core.messages import HumanMessage, SystemMessage
 from state import ArticleWorkflowState
 from config import Config
+from seo_validation import (
+    META_TITLE_RANGE,
+    META_DESCRIPTION_RANGE,
+    validate_meta,
+    validate_article,
+    build_report,
+    failing_fields,
+    assign_phrases_to_sections,
+    split_sections,
+    norm_heading,
+    phrase_present,
+    trim_to_words,
+    core_terms_present,
+)
 
 # ---------- Utils ----------
 
@@ -45,12 +62,15 @@ def _extract_main_content(html_content: bytes) -> str:
     # fallback: cały tekst
     return _clean_text(soup.get_text(" ", strip=True))
 
+def _scrape_headers() -> dict:
+    return {
+        "User-Agent": f"Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 "
+                      f"(KHTML, like Gecko) Chrome/123.0.{random.randint(1000,9999)}.0 Safari/537.36"
+    }
+
 def scrape_website(url: str, timeout: int = 15) -> str:
     try:
-        headers = {
-            "User-Agent": f"Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 "
-                          f"(KHTML, like Gecko) Chrome/123.0.{random.randint(1000,9999)}.0 Safari/537.36"
-        }
+        headers = _scrape_headers()
         r = requests.get(url, headers=headers, timeout=timeout)
         r.raise_for_status()
         text = _extract_main_content(r.content)
@@ -60,6 +80,19 @@ def scrape_website(url: str, timeout: int = 15) -> str:
         print(f"Scrape error for {url}: {e}")
         return ""
 
+async def scrape_website_async(client: httpx.AsyncClient, url: str, timeout: float = 15) -> str:
+    try:
+        r = await client.get(url, headers=_scrape_headers(), timeout=timeout)
+        r.raise_for_status()
+        # parsowanie HTML jest CPU-bound — nie blokujemy event loopa
+        text = await asyncio.to_thread(_extract_main_content, r.content)
+        return text[:8000]
+    except asyncio.CancelledError:
+        raise
+    except Exception as e:
+        print(f"Scrape error for {url}: {e}")
+        return ""
+
 def parse_json_strict(txt: str) -> Any:
     """
     Bardziej odporny parser JSON: obcina backticki, szuka pierwszego poprawnego JSON.
@@ -80,44 +113,169 @@ def parse_json_strict(txt: str) -> Any:
             continue
     raise ValueError("JSON parse failed")
 
-# ---------- Nodes ----------
+# ---------- Research helpers ----------
 
-def researcher_node(state: ArticleWorkflowState) -> dict:
-    print("🕵️ Research start")
-    keyword = state["keyword"]
+# hedged scraping: ile dobrych stron wystarczy i ile maksymalnie czekamy na całość
+RESEARCH_TARGET_PAGES = int(os.getenv("RESEARCH_TARGET_PAGES", "5"))
+RESEARCH_DEADLINE_S = float(os.getenv("RESEARCH_DEADLINE_S", "25"))
+# minimalna jakość strony: długość treści i obecność wyróżniających słów frazy
+PAGE_MIN_CHARS = 1200
+
+CSE_ENDPOINT = "https://www.googleapis.com/customsearch/v1"
+
+def _is_good_page(text: str, keyword: str) -> bool:
+    # "karma dla psa" wymaga "psa", a nie tylko "karm" — kwalifikatory typu "najlepsza" są opcjonalne
+    return len(text) >= PAGE_MIN_CHARS and core_terms_present(text, keyword)
+
+def _source_chunk(url: str, txt: str, keyword: str) -> str:
+    # priorytetyzacja fragmentów z keywordem
+    para = [p.strip() for p in re.split(r"(?<=\.)\s+", txt) if p.strip()]
+    hit = [p for p in para if keyword.lower() in p.lower()]
+    keep = " ".join(hit) if hit else txt
+    return f"--- SOURCE: {url} ---\n{keep[:6000]}\n"
+
+def _google_search_urls(keyword: str) -> List[str]:
     google_api_key = os.getenv("GOOGLE_API_KEY")
     google_cx = os.getenv("GOOGLE_CX")
+    if not google_api_key or not google_cx:
+        print("⚠️ Brak Google CSE. Podaj ręcznie 3–5 URL w przyszłości. Lecę bez SERP.")
+        return []
 
-    urls: List[str] = []
+    google_search = build("customsearch", "v1", developerKey=google_api_key)
+    for attempt in range(3):
+        try:
+            res = google_search.cse().list(
+                q=keyword, cx=google_cx, num=10, gl="pl", hl="pl", lr="lang_pl"
+            ).execute()
+            return [i["link"] for i in res.get("items", [])][:10]
+        except Exception as e:
+            print(f"CSE attempt {attempt+1} error: {e}")
+            time.sleep(1 + attempt)
+    return []
+
+async def _google_search_urls_async(client: httpx.AsyncClient, keyword: str) -> List[str]:
+    """
+    Async wariant _google_search_urls: woła REST API Custom Search bezpośrednio
+    (googleapiclient jest tylko synchroniczny).
+    """
+    google_api_key = os.getenv("GOOGLE_API_KEY")
+    google_cx = os.getenv("GOOGLE_CX")
     if not google_api_key or not google_cx:
         print("⚠️ Brak Google CSE. Podaj ręcznie 3–5 URL w przyszłości. Lecę bez SERP.")
-    else:
-        google_search = build("customsearch", "v1", developerKey=google_api_key)
-        for attempt in range(3):
-            try:
-                res = google_search.cse().list(
-                    q=keyword, cx=google_cx, num=10, gl="pl", hl="pl", lr="lang_pl"
-                ).execute()
-                urls = [i["link"] for i in res.get("items", [])][:10]
-                break
-            except Exception as e:
-                print(f"CSE attempt {attempt+1} error: {e}")
-                time.sleep(1 + attempt)
-        urls = urls[:8]  # i tak nie potrzebujemy więcej
-
-    print(f"🔗 URLs: {len(urls)}")
-    chunks: List[str] = []
-    for i, u in enumerate(urls, 1):
-        print(f"  [{i}/{len(urls)}] {u}")
-        txt = scrape_website(u)
-        if not txt:
-            continue
+        return []
 
-        # priorytetyzacja fragmentów z keywordem
-        para = [p.strip() for p in re.split(r"(?<=\.)\s+", txt) if p.strip()]
-        hit = [p for p in para if keyword.lower() in p.lower()]
-        keep = " ".join(hit) if hit else txt
-        chunks.append(f"--- SOURCE: {u} ---\n{keep[:6000]}\n")
+    params = {
+        "key": google_api_key, "cx": google_cx, "q": keyword,
+        "num": 10, "gl": "pl", "hl": "pl", "lr": "lang_pl",
+    }
+    for attempt in range(3):
+        try:
+            r = await client.get(CSE_ENDPOINT, params=params, timeout=15)
+            r.raise_for_status()
+            return [i["link"] for i in r.json().get("items", [])][:10]
+        except Exception as e:
+            print(f"CSE attempt {attempt+1} error: {e}")
+            await asyncio.sleep(1 + attempt)
+    return []
+
+def _hedged_params(state: ArticleWorkflowState) -> Tuple[int, float]:
+    return (
+        state.get("research_target_pages", RESEARCH_TARGET_PAGES),
+        state.get("research_deadline_s", RESEARCH_DEADLINE_S),
+    )
+
+def hedged_scrape(urls: List[str], keyword: str,
+                  target: int = RESEARCH_TARGET_PAGES,
+                  deadline_s: float = RESEARCH_DEADLINE_S) -> List[Tuple[str, str]]:
+    """
+    Scrapuje wszystkie kandydaty równolegle i kończy, gdy `target` stron przejdzie próg jakości
+    albo minie `deadline_s`. Reszta jest anulowana / porzucana.
+    Zwraca listę (url, tekst): najpierw dobre strony w kolejności ukończenia, potem słabsze
+    (tylko jeśli dobrych jest za mało).
+    """
+    good: List[Tuple[str, str]] = []
+    weak: List[Tuple[str, str]] = []
+    if not urls:
+        return good
+
+    started = time.monotonic()
+    pool = ThreadPoolExecutor(max_workers=len(urls))
+    futures = {
+        pool.submit(scrape_website, u, min(15, max(1, int(deadline_s)))): u
+        for u in urls
+    }
+    try:
+        for fut in as_completed(futures, timeout=deadline_s):
+            u = futures[fut]
+            txt = fut.result()
+            if not txt:
+                print(f"  ✗ pusto: {u}")
+                continue
+            if _is_good_page(txt, keyword):
+                good.append((u, txt))
+                print(f"  ✓ [{len(good)}/{target}] {u} ({time.monotonic() - started:.1f}s)")
+                if len(good) >= target:
+                    break
+            else:
+                weak.append((u, txt))
+                print(f"  ~ słaba strona: {u}")
+    except FuturesTimeout:
+        print(f"⏱️ Deadline researchu ({deadline_s:.0f}s) minął: {len(good)} dobrych, {len(weak)} słabych")
+    finally:
+        # nie czekamy na maruderów
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    return good + weak[:max(0, target - len(good))]
+
+async def hedged_scrape_async(client: httpx.AsyncClient, urls: List[str], keyword: str,
+                              target: int = RESEARCH_TARGET_PAGES,
+                              deadline_s: float = RESEARCH_DEADLINE_S) -> List[Tuple[str, str]]:
+    """
+    Async wariant hedged_scrape: te same zasady, ale pozostałe pobrania są faktycznie anulowane.
+    """
+    good: List[Tuple[str, str]] = []
+    weak: List[Tuple[str, str]] = []
+    if not urls:
+        return good
+
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    tasks = {
+        asyncio.create_task(scrape_website_async(client, u, min(15, deadline_s))): u
+        for u in urls
+    }
+    pending = set(tasks)
+    try:
+        while pending and len(good) < target:
+            remaining = deadline_s - (loop.time() - started)
+            if remaining <= 0:
+                print(f"⏱️ Deadline researchu ({deadline_s:.0f}s) minął: {len(good)} dobrych, {len(weak)} słabych")
+                break
+            done, pending = await asyncio.wait(pending, timeout=remaining, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                u = tasks[task]
+                txt = task.result()
+                if not txt:
+                    print(f"  ✗ pusto: {u}")
+                elif _is_good_page(txt, keyword):
+                    good.append((u, txt))
+                    print(f"  ✓ [{len(good)}/{target}] {u} ({loop.time() - started:.1f}s)")
+                else:
+                    weak.append((u, txt))
+                    print(f"  ~ słaba strona: {u}")
+    finally:
+        for task in pending:
+            task.cancel()
+        # daj anulowanym taskom posprzątać zanim klient HTTP zostanie zamknięty
+        await asyncio.gather(*pending, return_exceptions=True)
+
+    good = good[:target]
+    return good + weak[:max(0, target - len(good))]
+
+# ---------- Prompts / parsing (wspólne dla wersji sync i async) ----------
+
+def _build_corpus(pages: List[Tuple[str, str]], keyword: str) -> str:
+    chunks = [_source_chunk(u, txt, keyword) for u, txt in pages]
 
     corpus = "\n\n".join(chunks)
     # hard cap całości
@@ -126,10 +284,10 @@ def researcher_node(state: ArticleWorkflowState) -> dict:
 
     if not corpus:
         corpus = f"Brak treści z konkurencji. Napisz artykuł o: {keyword} bazując na wiedzy ogólnej i personie."
+    return corpus
 
-    # mini podsumowanie researchem przez GPT-5 (opcjonalnie, ale daje porządek)
-    llm = state["llm"]
-    summary_prompt = f"""
+def _research_summary_prompt(keyword: str, corpus: str) -> str:
+    return f"""
 Przeanalizuj poniższy korpus researchu dla hasła: "{keyword}".
 
 Twoim zadaniem jest przygotować **pełną analizę semantyczno-strategiczną** dla autora treści, która ma pozwolić stworzyć najlepszy możliwy opis zabiegu / artykuł.
@@ -163,22 +321,17 @@ Pamiętaj:
 
 Źródła:
 {corpus[:24000]}"""
-    summary = llm.invoke([HumanMessage(content=summary_prompt)]).content.strip()
 
-    print("✅ Research done")
+def _research_result(urls: List[str], pages: List[Tuple[str, str]], corpus: str, summary: str) -> dict:
     return {
         "research_corpus": corpus,
         "research_summary": summary,
-        "raw_research_data": {"urls": urls}
+        "raw_research_data": {"urls": urls, "used_urls": [u for u, _ in pages]}
     }
 
-def outline_generator_node(state: ArticleWorkflowState) -> dict:
-    print("📋 Outline")
-    llm = state["llm"]
+def _outline_prompt(state: ArticleWorkflowState) -> str:
     persona = state["persona"]
-    keyword = state["keyword"]
-
-    prompt = f"""Jesteś strategiem treści. Na podstawie researchu i persony zaproponuj konspekt artykułu w JSON.
+    return f"""Jesteś strategiem treści. Na podstawie researchu i persony zaproponuj konspekt artykułu w JSON.
 
 Zasady:
 - 4–7 sekcji H2
@@ -197,9 +350,11 @@ Odpowiedz JSON-em w formacie:
   ...
 ]
 """
-    raw = llm.invoke([HumanMessage(content=prompt)]).content
-    data = parse_json_strict(raw)
 
+def _parse_outline(raw: str) -> List[dict]:
+    return _validate_outline(parse_json_strict(raw))
+
+def _validate_outline(data: Any) -> List[dict]:
     if not isinstance(data, list) or not (4 <= len(data) <= 7):
         raise ValueError("Konspekt ma złą liczbę sekcji (wymagane 4–7).")
 
@@ -214,12 +369,9 @@ Odpowiedz JSON-em w formacie:
             h3 = []
         outline.append({"h2": h2, "h3": [ _clean_text(x) for x in h3 ]})
 
-    print("✅ Outline done")
-    return {"outline": outline}
+    return outline
 
-def full_article_writer_node(state: ArticleWorkflowState) -> dict:
-    print("✍️ Full article")
-    llm = state["llm"]
+def _article_messages(state: ArticleWorkflowState) -> list:
     persona = state["persona"]
     keyword = state["keyword"]
     outline = state["outline"]
@@ -253,21 +405,20 @@ Fragmenty z konkurencji (wybrane):
 {corpus[:20000]}
 """
     sys_msg = SystemMessage(content="Jesteś doświadczonym autorem SEO. Pisz klarownie, rzeczowo i bez lania wody.")
-    out = llm.invoke([sys_msg, HumanMessage(content=instruction)]).content
+    return [sys_msg, HumanMessage(content=instruction)]
 
-    h1_prompt = f'Wygeneruj krótki, chwytliwy H1 dla artykułu o: "{keyword}". Zwróć sam H1, bez cudzysłowów.'
-    h1 = llm.invoke([HumanMessage(content=h1_prompt)]).content.strip().strip('"').strip("'")
+def _h1_prompt(keyword: str) -> str:
+    return f'Wygeneruj krótki, chwytliwy H1 dla artykułu o: "{keyword}". Zwróć sam H1, bez cudzysłowów.'
 
+def _article_result(out: str, h1_raw: str) -> dict:
+    h1 = h1_raw.strip().strip('"').strip("'")
     article_md = f"# {h1}\n\n{out}".strip()
-    print("✅ Article done")
     return {"raw_article": article_md, "h1_title": h1}
 
-def final_editor_node(state: ArticleWorkflowState) -> dict:
-    print("✨ Polish")
-    llm = state["llm"]
+def _polish_prompt(state: ArticleWorkflowState) -> str:
     raw_article = state["raw_article"][:30000]  # safety cap
 
-    prompt = f"""Wykonaj końcowe szlifowanie tekstu: usuń powtórzenia, popraw styl i spójność.
+    return f"""Wykonaj końcowe szlifowanie tekstu: usuń powtórzenia, popraw styl i spójność.
 Nie zmieniaj sensu, nie skracaj agresywnie. Zachowaj nagłówki. Sprawdź poprawność w języku polskim. 
 Sprawdź, czy treść jest atrakcyjna dla czytelnika pod względem czytelności i UX.
 
@@ -275,17 +426,9 @@ Zwróć tylko poprawiony artykuł (Markdown).
 ---
 {raw_article}
 ---"""
-    final_article = llm.invoke([HumanMessage(content=prompt)]).content.strip()
-    print("✅ Polish done")
-    return {"final_article": final_article}
-
-def seo_generator_node(state: ArticleWorkflowState) -> dict:
-    print("🔧 SEO extras")
-    llm = state["llm"]
-    article = state["final_article"]
-    keyword = state["keyword"]
 
-    meta_prompt = f"""Na podstawie artykułu wygeneruj:
+def _meta_prompt(keyword: str, article: str) -> str:
+    return f"""Na podstawie artykułu wygeneruj:
 - Meta Title: 50–60 znaków, zawiera frazę docelową {keyword} lub jej naturalny wariant.
 - Meta Description: 140–160 znaków, konkretna obietnica wartości.
 
@@ -295,10 +438,322 @@ Zwróć JSON:
 Artykuł:
 {article[:12000]}
 """
-    raw = llm.invoke([HumanMessage(content=meta_prompt)]).content
-    meta = parse_json_strict(raw)
-    title = _clean_text(meta.get("title", ""))[:70]
-    desc = _clean_text(meta.get("description", ""))[:200]
 
-    print("✅ SEO done")
+def _parse_meta(raw: str, current: Dict[str, str] = None) -> dict:
+    # bez przycinania — długości sprawdza seo_validation, a poprawki robi LLM
+    meta = parse_json_strict(raw)
+    current = current or {}
+    title = _clean_text(meta.get("title", "")) or current.get("meta_title", "")
+    desc = _clean_text(meta.get("description", "")) or current.get("meta_description", "")
     return {"meta_title": title, "meta_description": desc}
+
+def _try_parse_meta(raw: str, current: Dict[str, str]) -> Dict[str, str]:
+    # nieudana runda (odpowiedź bez JSON-a) nie może wywrócić węzła — zostaje bieżące meta
+    try:
+        return _parse_meta(raw, current)
+    except (ValueError, AttributeError) as e:
+        print(f"  ⚠️ Nie udało się sparsować meta z odpowiedzi LLM: {e}")
+        return current
+
+# ile rund celowanych poprawek meta, zanim odpuścimy
+SEO_MAX_FIX_ROUNDS = 2
+
+_META_JSON_KEYS = {"meta_title": "title", "meta_description": "description"}
+
+def _meta_fix_prompt(keyword: str, meta: Dict[str, str], issues: List[dict], article: str) -> str:
+    fields = [f for f in failing_fields(issues) if f in _META_JSON_KEYS]
+    problems = "\n".join(f"- {i['message']}" for i in issues if i["field"] in fields)
+    current = {_META_JSON_KEYS[f]: meta[f] for f in fields}
+    answer = ", ".join(f'"{_META_JSON_KEYS[f]}": "..."' for f in fields)
+    return f"""Popraw meta dane artykułu o "{keyword}". Zwróć tylko pola wymienione niżej.
+
+Problemy:
+{problems}
+
+Wymagania:
+- Meta Title: {META_TITLE_RANGE[0]}–{META_TITLE_RANGE[1]} znaków, zawiera frazę docelową {keyword} lub jej naturalny wariant.
+- Meta Description: {META_DESCRIPTION_RANGE[0]}–{META_DESCRIPTION_RANGE[1]} znaków, konkretna obietnica wartości.
+
+Obecne wartości:
+{json.dumps(current, ensure_ascii=False)}
+
+Zwróć JSON:
+{{{answer}}}.
+
+Początek artykułu:
+{article[:3000]}
+"""
+
+def _phrase_fix_prompt(keyword: str, section: str, phrases: List[str]) -> str:
+    return f"""Dopracuj poniższą sekcję artykułu o "{keyword}": wpleć naturalnie brakujące frazy kluczowe (mogą być odmienione).
+Zasady:
+- zachowaj nagłówki, sens i styl tekstu
+- nie skracaj sekcji; jeśli fraza nie pasuje do istniejących zdań, dopisz najwyżej 1–2 zdania
+- język polski
+- zwróć tylko poprawioną sekcję (Markdown)
+
+Frazy: {", ".join(phrases)}
+
+Sekcja:
+{section}
+"""
+
+def _lead_fix_prompt(keyword: str, lead: str) -> str:
+    return f"""Przepisz wstęp artykułu tak, żeby naturalnie zawierał frazę "{keyword}" (może być odmieniona).
+Zasady:
+- zachowaj sens, długość i styl
+- bez nagłówków
+- język polski
+- zwróć tylko nowy wstęp
+
+Wstęp:
+{lead}
+"""
+
+def _seo_article_check(state: ArticleWorkflowState, article: str) -> Tuple[List[dict], List[str]]:
+    return validate_article(
+        article, state["keyword"], state.get("outline", []), state.get("research_summary", "")
+    )
+
+def _lead_text(article: str) -> str:
+    # wstęp bez H1
+    preamble, _ = split_sections(article)
+    if preamble.startswith("# "):
+        preamble = preamble.split("\n", 1)[1] if "\n" in preamble else ""
+    return preamble.strip()
+
+def _article_fix_requests(state: ArticleWorkflowState, article: str, issues: List[dict],
+                          missing: List[str]) -> List[Tuple[str, str]]:
+    """
+    Celowane poprawki artykułu: [(oryginalny fragment, prompt)]:
+    - sekcje H2, do których trafiają brakujące frazy must-have (gdy check pokrycia nie przeszedł),
+    - wstęp, gdy fraza nie pada ani w H1, ani we wstępie.
+    Checki struktury (H1, H2/H3 vs konspekt) są tylko raportowane w seo_report —
+    dopisywanie brakujących sekcji to już przepisywanie artykułu, nie celowana poprawka.
+    """
+    keyword = state["keyword"]
+    fixes = []
+    if any(i["check"] == "key_phrases" for i in issues):
+        _, sections = split_sections(article)
+        for key, phrases in assign_phrases_to_sections(article, missing).items():
+            print(f"  🩹 Frazy do sekcji: {', '.join(phrases)}")
+            fixes.append((sections[key], _phrase_fix_prompt(keyword, sections[key], phrases)))
+    lead = _lead_text(article)
+    if lead and any(i["check"] == "keyword" for i in issues):
+        print(f"  🩹 Fraza do wstępu: {keyword}")
+        fixes.append((lead, _lead_fix_prompt(keyword, lead)))
+    return fixes
+
+def _accept_section_fix(section: str, fixed: str) -> bool:
+    # poprawka musi dotyczyć tej samej sekcji (ten sam H2) i nie może jej skracać
+    heading = fixed.split("\n", 1)[0]
+    return (heading.startswith("## ")
+            and norm_heading(heading[3:]) == norm_heading(section.split("\n", 1)[0][3:])
+            and len(fixed) >= len(section))
+
+def _accept_lead_fix(keyword: str, fixed: str) -> bool:
+    # nowy wstęp: bez nagłówków i faktycznie z frazą
+    return bool(fixed) and not re.search(r"(?m)^#", fixed) and phrase_present(fixed, keyword)
+
+def _apply_article_fixes(article: str, keyword: str, fixes: List[Tuple[str, str]], outputs: List[str]) -> str:
+    for (original, _), fixed in zip(fixes, outputs):
+        fixed = fixed.strip()
+        is_section = original.startswith("## ")
+        ok = _accept_section_fix(original, fixed) if is_section else _accept_lead_fix(keyword, fixed)
+        if not ok:
+            label = original.split("\n", 1)[0] if is_section else "wstęp"
+            print(f"  ⚠️ Odrzucam poprawkę: {label}")
+            continue
+        article = article.replace(original, fixed, 1)
+    return article
+
+def _initial_meta(state: ArticleWorkflowState) -> Dict[str, str]:
+    # meta z bieżącego stanu albo z poprzedniego runu (odświeżenie) — jeśli przejdą checki, nie pytamy LLM
+    prev = state.get("previous_run") or {}
+    return {
+        "meta_title": state.get("meta_title") or prev.get("meta_title", ""),
+        "meta_description": state.get("meta_description") or prev.get("meta_description", ""),
+    }
+
+def _meta_generation_prompt(state: ArticleWorkflowState, meta: Dict[str, str], article: str) -> Optional[str]:
+    # pełne generowanie meta tylko gdy nie mamy nic do poprawienia
+    if any(meta.values()):
+        return None
+    return _meta_prompt(state["keyword"], article)
+
+def _meta_fix_request(keyword: str, meta: Dict[str, str], article: str) -> Optional[str]:
+    # prompt celowanej poprawki tylko dla pól, które nie przeszły checków; None = wszystko OK
+    issues = validate_meta(meta["meta_title"], meta["meta_description"], keyword)
+    if not failing_fields(issues):
+        return None
+    return _meta_fix_prompt(keyword, meta, issues, article)
+
+def _seo_result(state: ArticleWorkflowState, article: str, meta: Dict[str, str],
+                article_issues: List[dict], missing: List[str], llm_fixes: int) -> dict:
+    # po wyczerpaniu rund: za długie pola tniemy na granicy słowa, nie w środku
+    meta = {
+        "meta_title": trim_to_words(meta["meta_title"], META_TITLE_RANGE[1]),
+        "meta_description": trim_to_words(meta["meta_description"], META_DESCRIPTION_RANGE[1]),
+    }
+    meta_issues = validate_meta(meta["meta_title"], meta["meta_description"], state["keyword"])
+    report = build_report(article_issues, meta_issues, missing, llm_fixes)
+    for issue in report["issues"]:
+        print(f"  {'❌' if issue['severity'] == 'error' else '⚠️'} {issue['message']}")
+
+    result = {**meta, "seo_report": report}
+    if article != state["final_article"]:
+        result["final_article"] = article
+    return result
+
+# ---------- Nodes ----------
+
+def researcher_node(state: ArticleWorkflowState) -> dict:
+    print("🕵️ Research start")
+    keyword = state["keyword"]
+
+    urls = _google_search_urls(keyword)
+    target, deadline_s = _hedged_params(state)
+
+    print(f"🔗 URLs: {len(urls)} (cel: {target} dobrych stron, deadline {deadline_s:.0f}s)")
+    pages = hedged_scrape(urls, keyword, target=target, deadline_s=deadline_s)
+    corpus = _build_corpus(pages, keyword)
+
+    # mini podsumowanie researchem przez GPT-5 (opcjonalnie, ale daje porządek)
+    llm = state["llm"]
+    summary_prompt = _research_summary_prompt(keyword, corpus)
+    summary = llm.invoke([HumanMessage(content=summary_prompt)]).content.strip()
+
+    print("✅ Research done")
+    return _research_result(urls, pages, corpus, summary)
+
+def outline_generator_node(state: ArticleWorkflowState) -> dict:
+    print("📋 Outline")
+    llm = state["llm"]
+    raw = llm.invoke([HumanMessage(content=_outline_prompt(state))]).content
+    outline = _parse_outline(raw)
+
+    print("✅ Outline done")
+    return {"outline": outline}
+
+def full_article_writer_node(state: ArticleWorkflowState) -> dict:
+    print("✍️ Full article")
+    llm = state["llm"]
+    out = llm.invoke(_article_messages(state)).content
+    h1 = llm.invoke([HumanMessage(content=_h1_prompt(state["keyword"]))]).content
+
+    print("✅ Article done")
+    return _article_result(out, h1)
+
+def final_editor_node(state: ArticleWorkflowState) -> dict:
+    print("✨ Polish")
+    llm = state["llm"]
+    final_article = llm.invoke([HumanMessage(content=_polish_prompt(state))]).content.strip()
+    print("✅ Polish done")
+    return {"final_article": final_article}
+
+def seo_generator_node(state: ArticleWorkflowState) -> dict:
+    print("🔧 SEO extras")
+    llm = state["llm"]
+    keyword = state["keyword"]
+    article = state["final_article"]
+
+    # 1) artykuł: LLM tylko dla sekcji bez fraz must-have i wstępu bez frazy głównej
+    article_issues, missing = _seo_article_check(state, article)
+    fixes = _article_fix_requests(state, article, article_issues, missing)
+    if fixes:
+        outs = [llm.invoke([HumanMessage(content=prompt)]).content for _, prompt in fixes]
+        article = _apply_article_fixes(article, keyword, fixes, outs)
+        article_issues, missing = _seo_article_check(state, article)
+    llm_fixes = len(fixes)
+
+    # 2) meta: pełne generowanie tylko gdy nic nie mamy, potem celowane poprawki
+    meta = _initial_meta(state)
+    prompt = _meta_generation_prompt(state, meta, article)
+    if prompt:
+        meta = _try_parse_meta(llm.invoke([HumanMessage(content=prompt)]).content, meta)
+    for _ in range(SEO_MAX_FIX_ROUNDS):
+        prompt = _meta_fix_request(keyword, meta, article)
+        if not prompt:
+            break
+        meta = _try_parse_meta(llm.invoke([HumanMessage(content=prompt)]).content, meta)
+        llm_fixes += 1
+
+    print(f"✅ SEO done (poprawki LLM: {llm_fixes})")
+    return _seo_result(state, article, meta, article_issues, missing, llm_fixes)
+
+# ---------- Async nodes (graph.ainvoke / graph.astream) ----------
+
+async def researcher_node_async(state: ArticleWorkflowState) -> dict:
+    print("🕵️ Research start (async)")
+    keyword = state["keyword"]
+    target, deadline_s = _hedged_params(state)
+
+    async with httpx.AsyncClient(follow_redirects=True) as client:
+        urls = await _google_search_urls_async(client, keyword)
+        print(f"🔗 URLs: {len(urls)} (cel: {target} dobrych stron, deadline {deadline_s:.0f}s)")
+        pages = await hedged_scrape_async(client, urls, keyword, target=target, deadline_s=deadline_s)
+    corpus = _build_corpus(pages, keyword)
+
+    llm = state["llm"]
+    summary_prompt = _research_summary_prompt(keyword, corpus)
+    summary = (await llm.ainvoke([HumanMessage(content=summary_prompt)])).content.strip()
+
+    print("✅ Research done")
+    return _research_result(urls, pages, corpus, summary)
+
+async def outline_generator_node_async(state: ArticleWorkflowState) -> dict:
+    print("📋 Outline (async)")
+    llm = state["llm"]
+    raw = (await llm.ainvoke([HumanMessage(content=_outline_prompt(state))])).content
+    outline = _parse_outline(raw)
+
+    print("✅ Outline done")
+    return {"outline": outline}
+
+async def full_article_writer_node_async(state: ArticleWorkflowState) -> dict:
+    print("✍️ Full article (async)")
+    llm = state["llm"]
+    # artykuł i H1 są niezależne — lecą równolegle
+    out_msg, h1_msg = await asyncio.gather(
+        llm.ainvoke(_article_messages(state)),
+        llm.ainvoke([HumanMessage(content=_h1_prompt(state["keyword"]))]),
+    )
+
+    print("✅ Article done")
+    return _article_result(out_msg.content, h1_msg.content)
+
+async def final_editor_node_async(state: ArticleWorkflowState) -> dict:
+    print("✨ Polish (async)")
+    llm = state["llm"]
+    final_article = (await llm.ainvoke([HumanMessage(content=_polish_prompt(state))])).content.strip()
+    print("✅ Polish done")
+    return {"final_article": final_article}
+
+async def seo_generator_node_async(state: ArticleWorkflowState) -> dict:
+    print("🔧 SEO extras (async)")
+    llm = state["llm"]
+    keyword = state["keyword"]
+    article = state["final_article"]
+
+    article_issues, missing = _seo_article_check(state, article)
+    fixes = _article_fix_requests(state, article, article_issues, missing)
+    if fixes:
+        # sekcje są niezależne — poprawiamy równolegle
+        outs = await asyncio.gather(*(llm.ainvoke([HumanMessage(content=prompt)]) for _, prompt in fixes))
+        article = _apply_article_fixes(article, keyword, fixes, [msg.content for msg in outs])
+        article_issues, missing = _seo_article_check(state, article)
+    llm_fixes = len(fixes)
+
+    meta = _initial_meta(state)
+    prompt = _meta_generation_prompt(state, meta, article)
+    if prompt:
+        meta = _try_parse_meta((await llm.ainvoke([HumanMessage(content=prompt)])).content, meta)
+    for _ in range(SEO_MAX_FIX_ROUNDS):
+        prompt = _meta_fix_request(keyword, meta, article)
+        if not prompt:
+            break
+        meta = _try_parse_meta((await llm.ainvoke([HumanMessage(content=prompt)])).content, meta)
+        llm_fixes += 1
+
+    print(f"✅ SEO done (poprawki LLM: {llm_fixes})")
+    return _seo_result(state, article, meta, article_issues, missing, llm_fixes)
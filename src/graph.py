@@ -1,20 +1,43 @@
+import asyncio
+from typing import List, Union
 from langgraph.graph import StateGraph, END
+from langchain_core.runnables import RunnableLambda
 from state import ArticleWorkflowState
 from agents import (
     researcher_node,
     outline_generator_node,
     full_article_writer_node,
     final_editor_node,
-    seo_generator_node
+    seo_generator_node,
+    researcher_node_async,
+    outline_generator_node_async,
+    full_article_writer_node_async,
+    final_editor_node_async,
+    seo_generator_node_async,
 )
+from refresh import (
+    refresh_researcher_node,
+    refresh_summary_node,
+    refresh_outline_node,
+    refresh_writer_node,
+    refresh_researcher_node_async,
+    refresh_summary_node_async,
+    refresh_outline_node_async,
+    refresh_writer_node_async,
+    route_after_refresh_research,
+)
+
+def _node(func, afunc):
+    # stream/invoke wołają wersję sync, astream/ainvoke — async
+    return RunnableLambda(func, afunc=afunc, name=func.__name__)
 
 def build_workflow():
     g = StateGraph(ArticleWorkflowState)
-    g.add_node("researcher", researcher_node)
-    g.add_node("outline_generator", outline_generator_node)
-    g.add_node("full_article_writer", full_article_writer_node)
-    g.add_node("final_editor", final_editor_node)
-    g.add_node("seo_generator", seo_generator_node)
+    g.add_node("researcher", _node(researcher_node, researcher_node_async))
+    g.add_node("outline_generator", _node(outline_generator_node, outline_generator_node_async))
+    g.add_node("full_article_writer", _node(full_article_writer_node, full_article_writer_node_async))
+    g.add_node("final_editor", _node(final_editor_node, final_editor_node_async))
+    g.add_node("seo_generator", _node(seo_generator_node, seo_generator_node_async))
 
     g.set_entry_point("researcher")
     g.add_edge("researcher", "outline_generator")
@@ -24,6 +47,50 @@ def build_workflow():
     g.add_edge("seo_generator", END)
     return g.compile()
 
+def build_refresh_workflow():
+    """
+    Odświeżenie artykułu na bazie state["previous_run"]: diff SERP/treści → (jeśli są istotne zmiany)
+    aktualizacja summary → aktualizacja konspektu → przepisanie tylko dotkniętych sekcji → meta.
+    """
+    g = StateGraph(ArticleWorkflowState)
+    g.add_node("refresh_researcher", _node(refresh_researcher_node, refresh_researcher_node_async))
+    g.add_node("refresh_summary", _node(refresh_summary_node, refresh_summary_node_async))
+    g.add_node("refresh_outline", _node(refresh_outline_node, refresh_outline_node_async))
+    g.add_node("refresh_writer", _node(refresh_writer_node, refresh_writer_node_async))
+    g.add_node("seo_generator", _node(seo_generator_node, seo_generator_node_async))
+
+    g.set_entry_point("refresh_researcher")
+    g.add_conditional_edges(
+        "refresh_researcher",
+        route_after_refresh_research,
+        {"refresh_summary": "refresh_summary", "end": END},
+    )
+    g.add_edge("refresh_summary", "refresh_outline")
+    g.add_edge("refresh_outline", "refresh_writer")
+    g.add_edge("refresh_writer", "seo_generator")
+    g.add_edge("seo_generator", END)
+    return g.compile()
+
+async def run_workflows_async(states: List[ArticleWorkflowState],
+                              concurrency: int = 10) -> List[Union[dict, BaseException]]:
+    """
+    Generuje wiele artykułów na jednym event loopie (ainvoke), max `concurrency` naraz.
+    Zwraca listę w kolejności `states`: stan końcowy albo wyjątek danego artykułu —
+    błąd jednego artykułu (np. zły konspekt) nie przepada z wynikami pozostałych.
+    """
+    app = build_workflow()
+    sem = asyncio.Semaphore(concurrency)
+
+    async def _run(state):
+        async with sem:
+            try:
+                return await app.ainvoke(state)
+            except Exception as e:
+                print(f"❌ Artykuł \"{state.get('keyword', '?')}\" nie powstał: {e}")
+                raise
+
+    return await asyncio.gather(*(_run(s) for s in states), return_exceptions=True)
+
 if __name__ == "__main__":
     app = build_workflow()
     print("Workflow compiled successfully.")
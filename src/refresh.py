@@ -0,0 +1,338 @@
+# src/refresh.py
+# Tryb odświeżenia: bierze artefakty poprzedniego runu (previous_run), porównuje
+# aktualny SERP i treści stron z zapisanymi i przepisuje tylko to, co się zmieniło.
+import os
+import re
+import json
+import asyncio
+import httpx
+from typing import List, Dict, Any, Tuple
+from langchain_core.messages import HumanMessage, SystemMessage
+from state import ArticleWorkflowState
+from seo_validation import norm_heading, split_sections
+from agents import (
+    _google_search_urls,
+    _google_search_urls_async,
+    _build_corpus,
+    _hedged_params,
+    _validate_outline,
+    hedged_scrape,
+    hedged_scrape_async,
+    parse_json_strict,
+)
+
+# poniżej tego podobieństwa (Jaccard na 3-gramach słów) źródło uznajemy za zmienione
+REFRESH_MIN_SIMILARITY = float(os.getenv("REFRESH_MIN_SIMILARITY", "0.8"))
+
+# ---------- Diff ----------
+
+def _split_corpus(corpus: str) -> Dict[str, str]:
+    """
+    Rozbija korpus researchu z powrotem na {url: fragment} po znacznikach "--- SOURCE: ... ---".
+    """
+    parts = re.findall(r"--- SOURCE: (\S+) ---\n(.*?)(?=\n--- SOURCE: |\Z)", corpus or "", re.DOTALL)
+    return {url: txt.strip() for url, txt in parts}
+
+def _shingles(text: str, n: int = 3) -> set:
+    words = re.findall(r"\w+", text.lower())
+    return {" ".join(words[i:i + n]) for i in range(max(1, len(words) - n + 1))}
+
+def _similarity(a: str, b: str) -> float:
+    sa, sb = _shingles(a), _shingles(b)
+    if not sa or not sb:
+        return 1.0 if sa == sb else 0.0
+    return len(sa & sb) / len(sa | sb)
+
+def diff_sources(old: Dict[str, str], new: Dict[str, str], known_urls: set = frozenset(),
+                 min_similarity: float = REFRESH_MIN_SIMILARITY) -> Dict[str, Any]:
+    """
+    Porównuje źródła poprzedniego i bieżącego runu. "new" to tylko URL-e, których nie było
+    w poprzednim SERP (`known_urls`) — znany URL bez zapisanej treści (np. ucięty hard capem
+    korpusu) nie ma z czym się porównać i liczy się jako bez zmian.
+    """
+    diff = {"new": [], "changed": [], "unchanged": [], "removed": []}
+    for url, txt in new.items():
+        if url not in old:
+            diff["unchanged" if url in known_urls else "new"].append(url)
+        elif _similarity(old[url], txt) < min_similarity:
+            diff["changed"].append(url)
+        else:
+            diff["unchanged"].append(url)
+    # wypadły z SERP albo się nie pobrały
+    diff["removed"] = [u for u in old if u not in new]
+    # samo wypadnięcie źródła nie wnosi nowej treści
+    diff["meaningful"] = bool(diff["new"] or diff["changed"])
+    return diff
+
+def _changed_corpus(state: ArticleWorkflowState) -> str:
+    diff = state["refresh_diff"]
+    sources = _split_corpus(state["research_corpus"])
+    return "\n\n".join(
+        f"--- SOURCE: {u} ---\n{sources[u]}\n" for u in diff["new"] + diff["changed"] if u in sources
+    )
+
+def _previous_used_urls(prev: Dict[str, Any]) -> List[str]:
+    # starsze run.json nie mają used_urls — wtedy źródła bierzemy z korpusu
+    data = prev.get("raw_research_data") or {}
+    return data.get("used_urls") or list(_split_corpus(prev.get("research_corpus", "")))
+
+def _previous_serp_urls(prev: Dict[str, Any]) -> set:
+    data = prev.get("raw_research_data") or {}
+    return set(data.get("urls", [])) | set(_previous_used_urls(prev))
+
+def _refresh_fetch_plan(state: ArticleWorkflowState, urls: List[str]) -> Tuple[List[str], List[str]]:
+    """
+    Porównuje bieżący SERP z poprzednim i zwraca (do pobrania w całości, rezerwa na dobranie):
+    - poprzednie źródła, które nadal są w SERP (bez wczesnego stopu — inaczej kolejność
+      ukończenia pobrań udawałaby zmiany),
+    - NOWE URL-e z top-N (N = research_target_pages) — zawsze,
+    - rezerwa: pozostałe nowe URL-e, tylko do uzupełnienia źródeł, które padły.
+    Poprzednie źródła, które wypadły z SERP, nie są pobierane — diff oznaczy je jako "removed".
+    """
+    prev = state["previous_run"]
+    prev_used = _previous_used_urls(prev)
+    if not urls:
+        # bez SERP nie ma z czym porównać — sprawdzamy tylko treść poprzednich źródeł
+        print("⚠️ Brak SERP — porównuję tylko treść poprzednich źródeł")
+        return prev_used, []
+
+    target, _ = _hedged_params(state)
+    known = _previous_serp_urls(prev)
+    kept = [u for u in prev_used if u in urls]
+    fresh = [u for u in urls[:target] if u not in known]
+    reserve = [u for u in urls[target:] if u not in known]
+    print(f"🔗 Poprzednie źródła w SERP: {len(kept)}/{len(prev_used)}, nowe w top {target}: {len(fresh)}")
+    return kept + fresh, reserve
+
+def _topup_need(state: ArticleWorkflowState, pages: List[Tuple[str, str]]) -> int:
+    target, _ = _hedged_params(state)
+    return max(0, target - len(pages))
+
+def _refresh_research_result(state: ArticleWorkflowState, urls: List[str],
+                             pages: List[Tuple[str, str]]) -> dict:
+    prev = state["previous_run"]
+    corpus = _build_corpus(pages, state["keyword"])
+    diff = diff_sources(_split_corpus(prev.get("research_corpus", "")), _split_corpus(corpus),
+                        known_urls=_previous_serp_urls(prev))
+    print(f"🔍 Diff: nowe {len(diff['new'])}, zmienione {len(diff['changed'])}, "
+          f"bez zmian {len(diff['unchanged'])}, usunięte {len(diff['removed'])}")
+
+    result = {
+        "refresh_diff": diff,
+        "research_corpus": corpus,
+        "raw_research_data": {"urls": urls, "used_urls": [u for u, _ in pages]},
+    }
+    if not diff["meaningful"]:
+        print("✅ Brak istotnych zmian — zostawiam poprzednią wersję")
+        # przepisz artefakty poprzedniego runu, żeby stan był kompletny
+        for key in ("research_summary", "outline", "raw_article", "h1_title",
+                    "final_article", "meta_title", "meta_description"):
+            if key in prev:
+                result[key] = prev[key]
+        # korpus i raw_research_data muszą do siebie pasować w kolejnym run.json
+        result["research_corpus"] = prev.get("research_corpus", corpus)
+        result["raw_research_data"] = prev.get("raw_research_data", result["raw_research_data"])
+    return result
+
+def route_after_refresh_research(state: ArticleWorkflowState) -> str:
+    return "refresh_summary" if state["refresh_diff"]["meaningful"] else "end"
+
+# ---------- Prompts ----------
+
+def _refresh_summary_prompt(state: ArticleWorkflowState) -> str:
+    return f"""Masz poprzednią analizę semantyczno-strategiczną dla hasła: "{state['keyword']}" oraz NOWE lub ZMIENIONE źródła z aktualnego SERP.
+
+Zaktualizuj analizę:
+- zachowaj jej strukturę (mapa semantyczna, must-have frazy, luki konkurencji, rekomendacje),
+- dopisz lub zmień tylko to, co wynika z nowych źródeł,
+- usuń informacje, którym nowe źródła wyraźnie przeczą,
+- resztę pozostaw bez skracania.
+
+Zwróć pełną zaktualizowaną analizę.
+
+Poprzednia analiza:
+{state['previous_run'].get('research_summary', '')}
+
+Nowe / zmienione źródła:
+{_changed_corpus(state)[:24000]}"""
+
+def _refresh_outline_prompt(state: ArticleWorkflowState) -> str:
+    persona = state["persona"]
+    prev_outline = state["previous_run"].get("outline", [])
+    return f"""Jesteś strategiem treści. Masz istniejący konspekt artykułu o "{state['keyword']}" oraz nowe materiały z researchu.
+Zaktualizuj konspekt tylko tam, gdzie nowe materiały tego wymagają.
+
+Zasady:
+- 4–7 sekcji H2
+- sekcje bez zmian przepisz dokładnie (ten sam h2 i h3), z "changed": false
+- sekcje, które trzeba przepisać lub dodać, oznacz "changed": true
+- zero komentarzy, czysty JSON
+
+Persona: {persona['name']} — {persona['prompt'][:600]}
+
+Zaktualizowany research summary:
+{state['research_summary']}
+
+Nowe / zmienione źródła:
+{_changed_corpus(state)[:12000]}
+
+Obecny konspekt (JSON):
+{json.dumps(prev_outline, ensure_ascii=False)}
+
+Odpowiedz JSON-em w formacie:
+[
+  {{"h2": "Tytuł H2", "h3": ["Podpunkt 1","Podpunkt 2"], "changed": false}},
+  ...
+]
+"""
+
+def _parse_refresh_outline(raw: str, prev_outline: List[dict]) -> Tuple[List[dict], List[int]]:
+    data = parse_json_strict(raw)
+    outline = _validate_outline(data)
+    prev_h2 = {norm_heading(item.get("h2", "")) for item in prev_outline}
+    affected = [
+        i for i, (item, src) in enumerate(zip(outline, data))
+        if src.get("changed") or norm_heading(item["h2"]) not in prev_h2
+    ]
+    return outline, affected
+
+def _section_messages(state: ArticleWorkflowState, item: dict, old_section: str) -> list:
+    persona = state["persona"]
+    instruction = f"""Przepisz jedną sekcję artykułu SEO na temat: "{state['keyword']}", uwzględniając nowe informacje z researchu.
+Zasady:
+- zacznij od nagłówka "## {item['h2']}", użyj H3 z konspektu sekcji
+- 2–4 akapity, pełne spójne wypowiedzi
+- zachowaj to, co w poprzedniej wersji nadal jest aktualne
+- styl persony ma być zachowany
+- język polski, tekst gotowy do publikacji (bez dodatkowej korekty)
+- zwróć tylko tę sekcję (Markdown)
+
+Persona:
+{persona['name']} — {persona['prompt'][:800]}
+
+Sekcja konspektu (JSON):
+{json.dumps(item, ensure_ascii=False)}
+
+Poprzednia wersja sekcji:
+{old_section or "(brak — nowa sekcja)"}
+
+Zaktualizowany research summary:
+{state['research_summary'][:8000]}
+
+Nowe / zmienione źródła:
+{_changed_corpus(state)[:12000]}
+"""
+    sys_msg = SystemMessage(content="Jesteś doświadczonym autorem SEO. Pisz klarownie, rzeczowo i bez lania wody.")
+    return [sys_msg, HumanMessage(content=instruction)]
+
+# ---------- Składanie artykułu ----------
+
+def _sections_to_rewrite(state: ArticleWorkflowState) -> Tuple[str, Dict[str, str], List[int]]:
+    prev_article = state["previous_run"].get("final_article") or state["previous_run"].get("raw_article", "")
+    preamble, sections = split_sections(prev_article)
+    affected = set(state.get("refresh_sections", []))
+    # sekcje, których nie da się odnaleźć w starym tekście, też trzeba napisać
+    for i, item in enumerate(state["outline"]):
+        if norm_heading(item["h2"]) not in sections:
+            affected.add(i)
+    return preamble, sections, sorted(affected)
+
+def _refresh_article_result(state: ArticleWorkflowState, preamble: str,
+                            sections: Dict[str, str], rewritten: Dict[int, str]) -> dict:
+    body = [
+        rewritten[i].strip() if i in rewritten else sections[norm_heading(item["h2"])]
+        for i, item in enumerate(state["outline"])
+    ]
+    article = "\n\n".join([preamble] + body if preamble else body).strip()
+    # przepisane sekcje są pisane od razu "na czysto" — pełny polish nie jest potrzebny
+    return {"raw_article": article, "final_article": article}
+
+# ---------- Nodes ----------
+
+def refresh_researcher_node(state: ArticleWorkflowState) -> dict:
+    print("🔁 Refresh research")
+    keyword = state["keyword"]
+    _, deadline_s = _hedged_params(state)
+
+    urls = _google_search_urls(keyword)
+    fetch, reserve = _refresh_fetch_plan(state, urls)
+    pages = hedged_scrape(fetch, keyword, target=len(fetch), deadline_s=deadline_s)
+    need = _topup_need(state, pages)
+    if need and reserve:
+        print(f"➕ Dobieram {need} z {len(reserve)} nowych wyników SERP")
+        pages += hedged_scrape(reserve, keyword, target=need, deadline_s=deadline_s)
+    return _refresh_research_result(state, urls, pages)
+
+def refresh_summary_node(state: ArticleWorkflowState) -> dict:
+    print("🔁 Refresh summary")
+    llm = state["llm"]
+    summary = llm.invoke([HumanMessage(content=_refresh_summary_prompt(state))]).content.strip()
+    print("✅ Summary updated")
+    return {"research_summary": summary}
+
+def refresh_outline_node(state: ArticleWorkflowState) -> dict:
+    print("🔁 Refresh outline")
+    llm = state["llm"]
+    raw = llm.invoke([HumanMessage(content=_refresh_outline_prompt(state))]).content
+    outline, affected = _parse_refresh_outline(raw, state["previous_run"].get("outline", []))
+    print(f"✅ Outline updated, sekcje do przepisania: {affected}")
+    return {"outline": outline, "refresh_sections": affected}
+
+def refresh_writer_node(state: ArticleWorkflowState) -> dict:
+    print("🔁 Refresh sections")
+    llm = state["llm"]
+    preamble, sections, affected = _sections_to_rewrite(state)
+    rewritten = {}
+    for i in affected:
+        item = state["outline"][i]
+        print(f"  ✍️ {item['h2']}")
+        old = sections.get(norm_heading(item["h2"]), "")
+        rewritten[i] = llm.invoke(_section_messages(state, item, old)).content
+    print(f"✅ Przepisano {len(rewritten)}/{len(state['outline'])} sekcji")
+    return _refresh_article_result(state, preamble, sections, rewritten)
+
+# ---------- Async nodes ----------
+
+async def refresh_researcher_node_async(state: ArticleWorkflowState) -> dict:
+    print("🔁 Refresh research (async)")
+    keyword = state["keyword"]
+    _, deadline_s = _hedged_params(state)
+
+    async with httpx.AsyncClient(follow_redirects=True) as client:
+        urls = await _google_search_urls_async(client, keyword)
+        fetch, reserve = _refresh_fetch_plan(state, urls)
+        pages = await hedged_scrape_async(client, fetch, keyword, target=len(fetch), deadline_s=deadline_s)
+        need = _topup_need(state, pages)
+        if need and reserve:
+            print(f"➕ Dobieram {need} z {len(reserve)} nowych wyników SERP")
+            pages += await hedged_scrape_async(client, reserve, keyword, target=need, deadline_s=deadline_s)
+    return _refresh_research_result(state, urls, pages)
+
+async def refresh_summary_node_async(state: ArticleWorkflowState) -> dict:
+    print("🔁 Refresh summary (async)")
+    llm = state["llm"]
+    summary = (await llm.ainvoke([HumanMessage(content=_refresh_summary_prompt(state))])).content.strip()
+    print("✅ Summary updated")
+    return {"research_summary": summary}
+
+async def refresh_outline_node_async(state: ArticleWorkflowState) -> dict:
+    print("🔁 Refresh outline (async)")
+    llm = state["llm"]
+    raw = (await llm.ainvoke([HumanMessage(content=_refresh_outline_prompt(state))])).content
+    outline, affected = _parse_refresh_outline(raw, state["previous_run"].get("outline", []))
+    print(f"✅ Outline updated, sekcje do przepisania: {affected}")
+    return {"outline": outline, "refresh_sections": affected}
+
+async def refresh_writer_node_async(state: ArticleWorkflowState) -> dict:
+    print("🔁 Refresh sections (async)")
+    llm = state["llm"]
+    preamble, sections, affected = _sections_to_rewrite(state)
+    # sekcje są niezależne — przepisujemy równolegle
+    outs = await asyncio.gather(*(
+        llm.ainvoke(_section_messages(state, state["outline"][i],
+                                      sections.get(norm_heading(state["outline"][i]["h2"]), "")))
+        for i in affected
+    ))
+    rewritten = {i: msg.content for i, msg in zip(affected, outs)}
+    print(f"✅ Przepisano {len(rewritten)}/{len(state['outline'])} sekcji")
+    return _refresh_article_result(state, preamble, sections, rewritten)
@@ -0,0 +1,276 @@
+# src/seo_validation.py
+# Lokalna, deterministyczna walidacja SEO: meta, nagłówki vs konspekt, frazy z researchu.
+# Zero wywołań LLM — agents.py woła model tylko dla tego, co tu nie przeszło.
+import re
+from typing import List, Dict, Any, Tuple
+
+META_TITLE_RANGE = (50, 60)
+META_DESCRIPTION_RANGE = (140, 160)
+# min. odsetek fraz must-have z researchu, które muszą paść w artykule
+MIN_PHRASE_COVERAGE = 0.7
+MAX_KEY_PHRASES = 30
+
+# ---------- Odmiana / dopasowanie fraz ----------
+
+def _words(text: str) -> List[str]:
+    return re.findall(r"\w+", (text or "").lower())
+
+# słowa, które nie niosą tematu frazy — nie szukamy ich w tekście
+STOPWORDS = frozenset("""
+a aby albo ale bez by co czy dla do i iw jak jaki jaka jakie jest ku lub na nad nie o od oraz po pod
+przed przez przy się są to u w we z za ze że the of for and to in on
+""".split())
+# kwalifikatory frazy ("najlepsza", "ranking", "opinie") — mogą nie paść na stronie o temacie,
+# więc nie są wymagane przy ocenie jakości źródła
+QUALIFIER_STEMS = ("najleps", "najtańs", "tani", "tań", "dobr", "ranking", "opini", "cen", "top", "polec")
+
+# maks. o ile znaków odmieniony wyraz może być dłuższy od formy z frazy ("kota" ~ "kotami")
+_INFLECTION_SLACK = 3
+
+def _stem(word: str) -> str:
+    if len(word) <= 3:
+        return word
+    if len(word) <= 5:
+        return word[:3]          # "kota" -> "kot", "karma" -> "kar"
+    return word[:max(4, len(word) - 2)]
+
+def keyword_terms(phrase: str) -> List[Tuple[str, int]]:
+    """
+    Terminy frazy do dopasowania z odmianą: [(rdzeń, maks. długość wyrazu w tekście)].
+    Stopwordy pomijamy, rdzenie 4–5-literowych słów skracamy do 3 znaków ("kota" ~ "kotów").
+    Limit długości chroni przed fałszywymi trafieniami ("kota" !~ "kotłownia").
+    Wspólne dla progu jakości stron w researchu i checków SEO.
+    """
+    terms = {}
+    for w in _words(phrase):
+        if w not in STOPWORDS:
+            terms.setdefault(_stem(w), len(w) + _INFLECTION_SLACK)
+    return list(terms.items())
+
+def _term_match(token: str, term: Tuple[str, int]) -> bool:
+    stem, max_len = term
+    return token.startswith(stem) and len(token) <= max_len
+
+def terms_found(text: str, phrase: str) -> int:
+    """
+    Liczba RÓŻNYCH terminów frazy obecnych w tekście (nie suma wystąpień).
+    """
+    tokens = set(_words(text))
+    return sum(1 for term in keyword_terms(phrase) if any(_term_match(t, term) for t in tokens))
+
+def core_terms_present(text: str, phrase: str) -> bool:
+    """
+    Czy tekst jest o frazie: wszystkie terminy poza kwalifikatorami muszą paść,
+    bo to one odróżniają "karma dla psa" od "karma dla kota".
+    """
+    terms = keyword_terms(phrase)
+    core = [t for t in terms if not t[0].startswith(QUALIFIER_STEMS)] or terms
+    if not core:
+        return phrase.lower().strip() in (text or "").lower()
+    tokens = set(_words(text))
+    return all(any(_term_match(t, term) for t in tokens) for term in core)
+
+def phrase_present(text: str, phrase: str, slack: int = 2) -> bool:
+    """
+    Czy fraza (lub jej odmieniony wariant) występuje w tekście: wszystkie terminy
+    w oknie o długości frazy + `slack` słów, w dowolnej kolejności.
+    """
+    terms = keyword_terms(phrase)
+    if not terms:
+        return phrase.lower().strip() in (text or "").lower()
+    tokens = _words(text)
+    width = len(_words(phrase)) + slack
+    for i, tok in enumerate(tokens):
+        if not any(_term_match(tok, term) for term in terms):
+            continue
+        window = tokens[i:i + width]
+        if all(any(_term_match(t, term) for t in window) for term in terms):
+            return True
+    return False
+
+# ---------- Struktura Markdown ----------
+
+def norm_heading(h: str) -> str:
+    """
+    Klucz do porównywania nagłówków: bez pogrubień, numeracji dodanej przy polishu
+    ("1. ", "2.3) "), interpunkcji i wielkości liter.
+    """
+    h = re.sub(r"[*_]{2}", "", h or "").strip()
+    h = re.sub(r"^\d+(?:\.\d+)*[.)]\s+", "", h)
+    h = re.sub(r"\s+", " ", h).lower()
+    return re.sub(r"[^\w ]+", "", h).strip()
+
+def headings(article: str) -> List[Tuple[int, str]]:
+    return [(len(m.group(1)), m.group(2).strip().strip("*").strip())
+            for m in re.finditer(r"(?m)^(#{1,6})\s+(.+?)\s*#*\s*$", article or "")]
+
+def split_sections(article: str) -> Tuple[str, Dict[str, str]]:
+    """
+    Dzieli artykuł Markdown na wstęp (H1 + lead) i sekcje H2: {znormalizowany h2: tekst sekcji}.
+    """
+    parts = re.split(r"(?m)^(?=## )", article or "")
+    preamble = "" if parts and parts[0].startswith("## ") else parts.pop(0)
+    sections = {}
+    for part in parts:
+        heading = part.split("\n", 1)[0][3:]
+        sections[norm_heading(heading)] = part.strip()
+    if not sections:
+        # artykuł bez H2 — zostaje tylko H1, resztę trzeba napisać od nowa
+        first = preamble.strip().split("\n", 1)[0]
+        preamble = first if first.startswith("# ") else ""
+    return preamble.strip(), sections
+
+# ---------- Frazy z researchu ----------
+
+_BULLET_RE = re.compile(r"^([-*•]|\d+[.)])\s+")
+# etykiety struktury, nie frazy: "Wysoki priorytet", "Priorytet średni", ...
+_PRIORITY_RE = re.compile(r"^(?:priorytet\s+)?(?:wysoki|średni|sredni|niski)(?:\s+priorytet)?\b\s*[:–—-]?\s*",
+                          re.IGNORECASE)
+_QUESTIONS_RE = re.compile(r"^(?:#+\s*)?(?:pytania|paa\b|faq\b)", re.IGNORECASE)
+_QUESTION_WORDS = ("ile", "czy", "jak", "jaki", "jaka", "jakie", "kiedy", "dlaczego", "gdzie", "co", "kto")
+
+def _phrase_candidates(body: str) -> List[str]:
+    # po etykiecie priorytetu zostaje sama lista fraz ("Średni priorytet: karma mokra, karma bez zbóż")
+    if _PRIORITY_RE.match(body.replace("*", "")):
+        heads = [_PRIORITY_RE.sub("", body.replace("*", ""), count=1)]
+    else:
+        found = re.findall(r"\*\*(.+?)\*\*|[\"„“](.+?)[\"”]", body)
+        heads = [a or b for a, b in found] or [re.split(r"\s[–—-]\s|:|\(", body)[0]]
+    return [c.strip(" *.,;:").strip() for h in heads for c in h.split(",")]
+
+def extract_key_phrases(research_summary: str, limit: int = MAX_KEY_PHRASES) -> List[str]:
+    """
+    Wyciąga frazy z sekcji "Must-have frazy kluczowe" podsumowania researchu
+    (pogrubienia, cudzysłowy albo początek punktu przed myślnikiem/dwukropkiem/nawiasem;
+    listy po przecinku rozbijane). Pomijane są etykiety struktury (punkty kończące się ":",
+    punkty z podpunktami, priorytety) i wszystko pod nagłówkiem "Pytania"/PAA —
+    pytania to tematy, nie frazy do dosłownego użycia.
+    """
+    m = re.search(r"must[- ]have(.*?)(?=^\W*(?:#+\s*)?\**\s*3[.)]|^\W*\**\s*luki|\Z)",
+                  research_summary or "", re.IGNORECASE | re.DOTALL | re.MULTILINE)
+    if not m:
+        return []
+
+    lines = [(len(l) - len(l.lstrip()), l.strip()) for l in m.group(1).splitlines() if l.strip()]
+    phrases: List[str] = []
+    skip = None  # (wcięcie, czy nagłówek był punktem) bloku "Pytania"
+    for i, (indent, line) in enumerate(lines):
+        is_bullet = bool(_BULLET_RE.match(line))
+        if skip is not None:
+            head_indent, head_bullet = skip
+            if is_bullet and (indent > head_indent or (not head_bullet and indent >= head_indent)):
+                continue
+            skip = None
+
+        body = _BULLET_RE.sub("", line)
+        plain = body.replace("*", "").strip()
+        if _QUESTIONS_RE.match(plain):
+            skip = (indent, is_bullet)
+            continue
+        has_children = i + 1 < len(lines) and lines[i + 1][0] > indent and _BULLET_RE.match(lines[i + 1][1])
+        if not is_bullet or has_children or plain.endswith((":", "?")):
+            continue
+
+        for c in _phrase_candidates(body):
+            if (2 < len(c) <= 60 and len(c.split()) <= 6
+                    and c.split()[0].lower() not in _QUESTION_WORDS
+                    and c.lower() not in (p.lower() for p in phrases)):
+                phrases.append(c)
+    return phrases[:limit]
+
+# ---------- Walidacja ----------
+
+def _issue(field: str, check: str, message: str, severity: str = "error") -> Dict[str, str]:
+    return {"field": field, "check": check, "message": message, "severity": severity}
+
+def validate_meta(title: str, description: str, keyword: str) -> List[Dict[str, str]]:
+    issues = []
+    lo, hi = META_TITLE_RANGE
+    if not lo <= len(title) <= hi:
+        issues.append(_issue("meta_title", "length", f"Meta title ma {len(title)} znaków (wymagane {lo}–{hi})."))
+    if not phrase_present(title, keyword):
+        issues.append(_issue("meta_title", "keyword", f'Meta title nie zawiera frazy "{keyword}" ani jej wariantu.'))
+
+    lo, hi = META_DESCRIPTION_RANGE
+    if not lo <= len(description) <= hi:
+        issues.append(_issue("meta_description", "length",
+                             f"Meta description ma {len(description)} znaków (wymagane {lo}–{hi})."))
+    if not phrase_present(description, keyword):
+        issues.append(_issue("meta_description", "keyword",
+                             f'Meta description nie zawiera frazy "{keyword}".', severity="warning"))
+    return issues
+
+def validate_article(article: str, keyword: str, outline: List[dict],
+                     research_summary: str) -> Tuple[List[Dict[str, str]], List[str]]:
+    """
+    Zwraca (issues, brakujące frazy must-have).
+    """
+    issues = []
+    hs = headings(article)
+    h1s = [t for lvl, t in hs if lvl == 1]
+    if len(h1s) != 1:
+        issues.append(_issue("article", "h1", f"Artykuł ma {len(h1s)} nagłówków H1 (wymagany 1)."))
+    elif not phrase_present(h1s[0], keyword):
+        issues.append(_issue("article", "h1_keyword", f'H1 nie zawiera frazy "{keyword}".', severity="warning"))
+
+    preamble, _ = split_sections(article)
+    lead = " ".join(_words(re.sub(r"(?m)^#.*$", "", preamble))[:150])
+    if not phrase_present(lead, keyword) and not (h1s and phrase_present(h1s[0], keyword)):
+        issues.append(_issue("article", "keyword", f'Fraza "{keyword}" nie pada w H1 ani we wstępie.'))
+
+    h2s = {norm_heading(t) for lvl, t in hs if lvl == 2}
+    h3s = {norm_heading(t) for lvl, t in hs if lvl == 3}
+    for item in outline or []:
+        if norm_heading(item.get("h2", "")) not in h2s:
+            issues.append(_issue("article", "outline_h2", f'Brak sekcji H2 z konspektu: "{item.get("h2")}".'))
+        for h3 in item.get("h3", []):
+            if norm_heading(h3) not in h3s:
+                issues.append(_issue("article", "outline_h3", f'Brak H3 z konspektu: "{h3}".', severity="warning"))
+
+    phrases = extract_key_phrases(research_summary)
+    missing = [p for p in phrases if not phrase_present(article, p)]
+    if phrases and (len(phrases) - len(missing)) / len(phrases) < MIN_PHRASE_COVERAGE:
+        issues.append(_issue("article", "key_phrases",
+                             f"Pokrycie fraz must-have {len(phrases) - len(missing)}/{len(phrases)} "
+                             f"(wymagane {MIN_PHRASE_COVERAGE:.0%})."))
+    return issues, missing
+
+def build_report(article_issues: List[Dict[str, str]], meta_issues: List[Dict[str, str]],
+                 missing_phrases: List[str], llm_fixes: int) -> Dict[str, Any]:
+    issues = article_issues + meta_issues
+    return {
+        "passed": not any(i["severity"] == "error" for i in issues),
+        "issues": issues,
+        "missing_phrases": missing_phrases,
+        "llm_fixes": llm_fixes,
+    }
+
+def failing_fields(issues: List[Dict[str, str]]) -> List[str]:
+    return sorted({i["field"] for i in issues if i["severity"] == "error"})
+
+def assign_phrases_to_sections(article: str, phrases: List[str], max_sections: int = 3) -> Dict[str, List[str]]:
+    """
+    Przypisuje brakujące frazy do sekcji H2, z którymi mają najwięcej wspólnych rdzeni,
+    i zwraca max `max_sections` sekcji z największą liczbą fraz: {znormalizowany h2: [frazy]}.
+    """
+    _, sections = split_sections(article)
+    if not sections:
+        return {}
+    plan: Dict[str, List[str]] = {}
+    for phrase in phrases:
+        terms = keyword_terms(phrase)
+        best = max(sections, key=lambda k: sum(1 for term in terms for t in _words(sections[k]) if _term_match(t, term)))
+        plan.setdefault(best, []).append(phrase)
+    top = sorted(plan, key=lambda k: len(plan[k]), reverse=True)[:max_sections]
+    return {k: plan[k] for k in top}
+
+def trim_to_words(text: str, max_len: int) -> str:
+    """
+    Ostatnia deska ratunku po nieudanych poprawkach: tnie na granicy słowa, nie w środku.
+    """
+    if len(text) <= max_len:
+        return text
+    cut = text[:max_len + 1]
+    if " " not in cut:
+        return text[:max_len]
+    return cut.rsplit(" ", 1)[0].rstrip(" ,;:–-")
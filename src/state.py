@@ -11,6 +11,8 @@ class ArticleWorkflowState(TypedDict, total=False):
     keyword: str
     persona: dict
     llm: Runnable
+    research_target_pages: int     # opcjonalnie: ile dobrych stron wystarczy
+    research_deadline_s: float     # opcjonalnie: deadline hedged scrapingu
 
     # Research
     research_corpus: str
@@ -28,3 +30,9 @@ class ArticleWorkflowState(TypedDict, total=False):
     # SEO
     meta_title: str
     meta_description: str
+    seo_report: Dict[str, Any]     # wynik lokalnej walidacji SEO (seo_validation)
+
+    # Tryb odświeżenia
+    previous_run: Dict[str, Any]   # artefakty poprzedniego runu (run.json)
+    refresh_diff: Dict[str, Any]   # new / changed / unchanged / removed + meaningful
+    refresh_sections: List[int]    # indeksy sekcji konspektu do przepisania
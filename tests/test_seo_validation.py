@@ -0,0 +1,83 @@
+from seo_validation import (
+    core_terms_present,
+    extract_key_phrases,
+    norm_heading,
+    phrase_present,
+    trim_to_words,
+    validate_meta,
+)
+
+KEYWORD = "najlepsza karma dla kota"
+
+
+# ---------- Odmiana / dopasowanie fraz ----------
+
+def test_phrase_present_matches_inflected_variant():
+    assert phrase_present("Najlepsze karmy dla kotów – ranking", KEYWORD)
+    assert phrase_present("Karmy mokre dla kota są lepsze", "karma dla kota")
+    assert phrase_present("Jaką karmę wybrać dla kotów?", "karma dla kota")
+
+
+def test_phrase_present_requires_distinguishing_word():
+    assert not phrase_present("Najlepsza karma dla kota – ranking", "karma dla psa")
+
+
+def test_phrase_present_rejects_prefix_lookalikes():
+    assert not phrase_present("Karta kariery kotłownia", "karma dla kota")
+
+
+def test_validate_meta_accepts_inflected_keyword_in_title():
+    title = "Najlepsze karmy dla kotów – ranking i porady weterynarza"
+    desc = "Sprawdź, jaka karma dla kota sprawdzi się najlepiej: porównanie składu, cen i opinii. " \
+           "Podpowiadamy, na co zwrócić uwagę przy wyborze karmy."
+    issues = validate_meta(title, desc, KEYWORD)
+    assert not [i for i in issues if i["field"] == "meta_title"]
+
+
+def test_validate_meta_flags_off_topic_title():
+    title = "Najlepsza karma dla psa – ranking i porady weterynarza"
+    issues = validate_meta(title, "x" * 150, KEYWORD)
+    assert any(i["field"] == "meta_title" and i["check"] == "keyword" for i in issues)
+
+
+def test_core_terms_present():
+    assert not core_terms_present("karma dla kota. " * 200, "karma dla psa")
+    assert not core_terms_present("Przepis na sernik dla rodziny. " * 50, KEYWORD)
+    # kwalifikator "najlepsza" nie jest wymagany, "kot" ~ "kota"
+    assert core_terms_present("Jaka karma dla kotów? Mokra karma i kot seniora. " * 30, KEYWORD)
+
+
+# ---------- Frazy z researchu ----------
+
+def test_extract_key_phrases_skips_labels_and_questions():
+    summary = """1. **Mapa semantyczna**
+- coś
+
+2. **Must-have frazy kluczowe**
+   - **Wysoki priorytet:**
+     - karma dla kota – główna fraza, w H1
+     - sucha karma (kontekst: porównania)
+   - **Średni priorytet:** karma mokra, karma bez zbóż
+   - **Pytania PAA:**
+     - Ile karmy dziennie dla kota
+     - Czy sucha karma jest zdrowa?
+
+3. **Luki i przewagi konkurencji**
+- **nie to**
+"""
+    assert extract_key_phrases(summary) == ["karma dla kota", "sucha karma", "karma mokra", "karma bez zbóż"]
+
+
+# ---------- Struktura / przycinanie ----------
+
+def test_norm_heading_ignores_numbering_and_bold():
+    assert norm_heading("1. Jak działa zabieg?") == norm_heading("Jak działa zabieg")
+    assert norm_heading("**2.3) Jak działa zabieg**") == "jak działa zabieg"
+    assert norm_heading("5 błędów przy karmieniu") == "5 błędów przy karmieniu"
+
+
+def test_trim_to_words():
+    assert len(trim_to_words("x" * 70, 60)) == 60
+    trimmed = trim_to_words("Najlepsza karma dla kota – ranking i porady weterynarza na rok 2026", 60)
+    assert len(trimmed) <= 60 and not trimmed.endswith(" ")
+    assert trim_to_words("krótki", 60) == "krótki"